@@ -7,8 +7,11 @@ for extracurricular activities at Mergington High School.
 
 from fastapi import FastAPI, HTTPException
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, Response
+from pydantic import BaseModel
+import orjson
 import os
+import threading
 from pathlib import Path
 
 app = FastAPI(title="Mergington High School API",
@@ -19,65 +22,79 @@ current_dir = Path(__file__).parent
 app.mount("/static", StaticFiles(directory=os.path.join(Path(__file__).parent,
           "static")), name="static")
 
-# In-memory activity database
+# In-memory activity database; participants are kept as dict keys, an ordered
+# set that gives O(1) membership checks while preserving signup order
 activities = {
     "Chess Club": {
         "description": "Learn strategies and compete in chess tournaments",
         "schedule": "Fridays, 3:30 PM - 5:00 PM",
         "max_participants": 12,
-        "participants": ["michael@mergington.edu", "daniel@mergington.edu"]
+        "participants": dict.fromkeys(["michael@mergington.edu", "daniel@mergington.edu"])
     },
     "Programming Class": {
         "description": "Learn programming fundamentals and build software projects",
         "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
         "max_participants": 20,
-        "participants": ["emma@mergington.edu", "sophia@mergington.edu"]
+        "participants": dict.fromkeys(["emma@mergington.edu", "sophia@mergington.edu"])
     },
     "Gym Class": {
         "description": "Physical education and sports activities",
         "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
         "max_participants": 30,
-        "participants": ["john@mergington.edu", "olivia@mergington.edu"]
+        "participants": dict.fromkeys(["john@mergington.edu", "olivia@mergington.edu"])
     },
     "Soccer Team": {
         "description": "Competitive soccer training and matches",
         "schedule": "Mondays, Wednesdays, 4:00 PM - 6:00 PM",
         "max_participants": 18,
-        "participants": ["ryan@mergington.edu", "lisa@mergington.edu"]
+        "participants": dict.fromkeys(["ryan@mergington.edu", "lisa@mergington.edu"])
     },
     "Basketball Club": {
         "description": "Pick-up games, drills, and intramural tournaments",
         "schedule": "Tuesdays and Thursdays, 5:00 PM - 7:00 PM",
         "max_participants": 15,
-        "participants": ["mark@mergington.edu", "nina@mergington.edu"]
+        "participants": dict.fromkeys(["mark@mergington.edu", "nina@mergington.edu"])
     },
     "Art Club": {
         "description": "Explore drawing, painting, and mixed media projects",
         "schedule": "Wednesdays, 3:30 PM - 5:00 PM",
         "max_participants": 20,
-        "participants": ["hazel@mergington.edu", "aaron@mergington.edu"]
+        "participants": dict.fromkeys(["hazel@mergington.edu", "aaron@mergington.edu"])
     },
     "Theater Club": {
         "description": "Acting, stagecraft, and production of school plays",
         "schedule": "Fridays, 4:00 PM - 6:00 PM",
         "max_participants": 25,
-        "participants": ["isabella@mergington.edu", "tom@mergington.edu"]
+        "participants": dict.fromkeys(["isabella@mergington.edu", "tom@mergington.edu"])
     },
     "Debate Team": {
         "description": "Practice argumentation, public speaking, and competitions",
         "schedule": "Mondays and Thursdays, 4:00 PM - 5:30 PM",
         "max_participants": 16,
-        "participants": ["sara@mergington.edu", "leo@mergington.edu"]
+        "participants": dict.fromkeys(["sara@mergington.edu", "leo@mergington.edu"])
     },
     "Science Olympiad": {
         "description": "Hands-on STEM challenges and interschool competitions",
         "schedule": "Tuesdays, 3:30 PM - 5:30 PM",
         "max_participants": 24,
-        "participants": ["maria@mergington.edu", "kevin@mergington.edu"]
+        "participants": dict.fromkeys(["maria@mergington.edu", "kevin@mergington.edu"])
     }
 }
 
 
+# Serialized GET /activities body, rebuilt lazily after any change to activities.
+# Sync handlers run concurrently in the threadpool, so changes to activities and
+# rebuilding the cached body both happen under this lock.
+_activities_json = None
+_activities_lock = threading.Lock()
+
+
+def invalidate_activities_cache():
+    """Discard the cached GET /activities response after activities change"""
+    global _activities_json
+    _activities_json = None
+
+
 @app.get("/")
 def root():
     return RedirectResponse(url="/static/index.html")
@@ -85,7 +102,16 @@ def root():
 
 @app.get("/activities")
 def get_activities():
-    return activities
+    global _activities_json
+    with _activities_lock:
+        if _activities_json is None:
+            # Participants are stored as insertion-ordered dict keys; serialize them as lists
+            _activities_json = orjson.dumps({
+                name: {**details, "participants": list(details["participants"])}
+                for name, details in activities.items()
+            })
+        body = _activities_json
+    return Response(content=body, media_type="application/json")
 
 
 @app.post("/activities/{activity_name}/signup")
@@ -98,15 +124,47 @@ def signup_for_activity(activity_name: str, email: str):
     # Get the specific activity
     activity = activities[activity_name]
 
-    # Validate student is not already signed up
-    if email in activity["participants"]:
-        raise HTTPException(status_code=400, detail="Student already signed up for this activity")
+    with _activities_lock:
+        # Validate student is not already signed up
+        if email in activity["participants"]:
+            raise HTTPException(status_code=400, detail="Student already signed up for this activity")
 
-    # Add student
-    activity["participants"].append(email)
+        # Add student
+        activity["participants"][email] = None
+        invalidate_activities_cache()
     return {"message": f"Signed up {email} for {activity_name}"}
 
 
+class BatchSignupRequest(BaseModel):
+    emails: list[str]
+
+
+@app.post("/activities/{activity_name}/signup:batch")
+def batch_signup_for_activity(activity_name: str, batch: BatchSignupRequest):
+    """Sign up several students for an activity in a single request"""
+    # Validate activity exists
+    if activity_name not in activities:
+        raise HTTPException(status_code=404, detail="Activity not found")
+
+    # Get the specific activity
+    participants = activities[activity_name]["participants"]
+
+    # Add each student, recording the ones that were already signed up;
+    # repeated emails in the request are handled once, in request order
+    signed_up = []
+    already_signed_up = []
+    with _activities_lock:
+        for email in dict.fromkeys(batch.emails):
+            if email in participants:
+                already_signed_up.append(email)
+            else:
+                participants[email] = None
+                signed_up.append(email)
+        if signed_up:
+            invalidate_activities_cache()
+    return {"signed_up": signed_up, "already_signed_up": already_signed_up}
+
+
 @app.delete("/activities/{activity_name}/unregister")
 def unregister_from_activity(activity_name: str, email: str):
     """Unregister a student from an activity"""
@@ -117,10 +175,12 @@ def unregister_from_activity(activity_name: str, email: str):
     # Get the specific activity
     activity = activities[activity_name]
 
-    # Validate student is signed up
-    if email not in activity["participants"]:
-        raise HTTPException(status_code=400, detail="Student not signed up for this activity")
+    with _activities_lock:
+        # Validate student is signed up
+        if email not in activity["participants"]:
+            raise HTTPException(status_code=400, detail="Student not signed up for this activity")
 
-    # Remove student
-    activity["participants"].remove(email)
+        # Remove student
+        del activity["participants"][email]
+        invalidate_activities_cache()
     return {"message": f"Unregistered {email} from {activity_name}"}
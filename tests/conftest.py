@@ -0,0 +1,50 @@
+"""Shared pytest configuration for the API tests"""
+
+import asyncio
+
+import pytest
+
+# Test classes that only read state. They run first so that basic failures
+# (app not serving the redirect or the activity listing) are reported before
+# the mutation tests that depend on them, and so that the tests sharing the
+# module-scoped GET /activities response run back to back.
+READ_ONLY_TEST_CLASSES = {"TestRootEndpoint", "TestGetActivities"}
+
+
+def _is_read_only(item):
+    # Only Python function items have a cls attribute (doctest items do not)
+    cls = getattr(item, "cls", None)
+    return cls is not None and cls.__name__ in READ_ONLY_TEST_CLASSES
+
+
+def pytest_collection_modifyitems(items):
+    """Run read-only tests before tests that mutate activities"""
+    items.sort(key=lambda item: 0 if _is_read_only(item) else 1)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def uvloop_event_loop_policy():
+    """Run TestClient's event loops on uvloop when available
+
+    TestClient starts its loops through anyio, which reads the global event
+    loop policy. pytest-asyncio tests get uvloop via the hook below instead.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        yield
+        return
+
+    original_policy = asyncio.get_event_loop_policy()
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    yield
+    asyncio.set_event_loop_policy(original_policy)
+
+
+def pytest_asyncio_loop_factories(config, item):
+    """Create pytest-asyncio test loops with uvloop when available"""
+    try:
+        import uvloop
+    except ImportError:
+        return {"asyncio": asyncio.new_event_loop}
+    return {"uvloop": uvloop.new_event_loop}
@@ -4,80 +4,149 @@ Tests for the High School Management System API
 This module contains pytest tests for all API endpoints including:
 - GET /activities - List all activities
 - POST /activities/{activity_name}/signup - Sign up for an activity
+- POST /activities/{activity_name}/signup:batch - Sign up several students at once
 - DELETE /activities/{activity_name}/unregister - Unregister from an activity
 """
 
+import asyncio
+import pickle
+import sys
+import threading
+from types import SimpleNamespace
+
+import orjson
 import pytest
-from fastapi.testclient import TestClient
-from src.app import app, activities
 
 
-@pytest.fixture
+# Endpoint paths, pre-encoded once and reused across tests
+CHESS_SIGNUP = "/activities/Chess%20Club/signup"
+CHESS_BATCH_SIGNUP = "/activities/Chess%20Club/signup:batch"
+CHESS_UNREGISTER = "/activities/Chess%20Club/unregister"
+PROGRAMMING_SIGNUP = "/activities/Programming%20Class/signup"
+PROGRAMMING_UNREGISTER = "/activities/Programming%20Class/unregister"
+ART_SIGNUP = "/activities/Art%20Club/signup"
+NONEXISTENT_SIGNUP = "/activities/Nonexistent%20Club/signup"
+NONEXISTENT_BATCH_SIGNUP = "/activities/Nonexistent%20Club/signup:batch"
+NONEXISTENT_UNREGISTER = "/activities/Nonexistent%20Club/unregister"
+
+
+def _signup_poster(url):
+    """Build a signup helper bound to a fixed, pre-encoded signup URL"""
+    def signup(client, email):
+        return client.post(url, params={"email": email})
+    return signup
+
+
+signup_chess_club = _signup_poster(CHESS_SIGNUP)
+signup_programming_class = _signup_poster(PROGRAMMING_SIGNUP)
+signup_art_club = _signup_poster(ART_SIGNUP)
+signup_nonexistent_club = _signup_poster(NONEXISTENT_SIGNUP)
+
+EXPECTED_LOCATION = sys.intern("/static/index.html")
+
+VALID_EMAILS = [
+    "test@mergington.edu",
+    "first.last@mergington.edu",
+    "student123@mergington.edu"
+]
+
+
+def json_body(response):
+    """Decode a response body with orjson instead of the stdlib json module"""
+    return orjson.loads(response.content)
+
+
+@pytest.fixture(scope="session")
 def client():
-    """Create a test client for the FastAPI app"""
-    return TestClient(app)
+    """Create a single test client for the FastAPI app, shared by all tests"""
+    # Imported lazily so that test collection does not pay for httpx/starlette
+    from fastapi.testclient import TestClient
+    from src.app import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+# Canonical initial state, pickled once at import time so each reset is a
+# single C-level pickle.loads that yields fresh, unshared participant dicts
+_TEMPLATE_BYTES = pickle.dumps({
+    "Chess Club": {
+        "description": "Learn strategies and compete in chess tournaments",
+        "schedule": "Fridays, 3:30 PM - 5:00 PM",
+        "max_participants": 12,
+        "participants": dict.fromkeys(["michael@mergington.edu", "daniel@mergington.edu"])
+    },
+    "Programming Class": {
+        "description": "Learn programming fundamentals and build software projects",
+        "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
+        "max_participants": 20,
+        "participants": dict.fromkeys(["emma@mergington.edu", "sophia@mergington.edu"])
+    },
+    "Gym Class": {
+        "description": "Physical education and sports activities",
+        "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
+        "max_participants": 30,
+        "participants": dict.fromkeys(["john@mergington.edu", "olivia@mergington.edu"])
+    },
+    "Soccer Team": {
+        "description": "Competitive soccer training and matches",
+        "schedule": "Mondays, Wednesdays, 4:00 PM - 6:00 PM",
+        "max_participants": 18,
+        "participants": dict.fromkeys(["ryan@mergington.edu", "lisa@mergington.edu"])
+    },
+    "Basketball Club": {
+        "description": "Pick-up games, drills, and intramural tournaments",
+        "schedule": "Tuesdays and Thursdays, 5:00 PM - 7:00 PM",
+        "max_participants": 15,
+        "participants": dict.fromkeys(["mark@mergington.edu", "nina@mergington.edu"])
+    },
+    "Art Club": {
+        "description": "Explore drawing, painting, and mixed media projects",
+        "schedule": "Wednesdays, 3:30 PM - 5:00 PM",
+        "max_participants": 20,
+        "participants": dict.fromkeys(["hazel@mergington.edu", "aaron@mergington.edu"])
+    },
+    "Theater Club": {
+        "description": "Acting, stagecraft, and production of school plays",
+        "schedule": "Fridays, 4:00 PM - 6:00 PM",
+        "max_participants": 25,
+        "participants": dict.fromkeys(["isabella@mergington.edu", "tom@mergington.edu"])
+    },
+    "Debate Team": {
+        "description": "Practice argumentation, public speaking, and competitions",
+        "schedule": "Mondays and Thursdays, 4:00 PM - 5:30 PM",
+        "max_participants": 16,
+        "participants": dict.fromkeys(["sara@mergington.edu", "leo@mergington.edu"])
+    },
+    "Science Olympiad": {
+        "description": "Hands-on STEM challenges and interschool competitions",
+        "schedule": "Tuesdays, 3:30 PM - 5:30 PM",
+        "max_participants": 24,
+        "participants": dict.fromkeys(["maria@mergington.edu", "kevin@mergington.edu"])
+    }
+}, protocol=5)
+
+
+def _load_initial_activities():
+    """Install a fresh copy of the canonical activities in the app and return it"""
+    import src.app as app_module
+
+    # Rebind to a fresh dict; the route handlers look activities up as a module global
+    app_module.activities = pickle.loads(_TEMPLATE_BYTES)
+    app_module.invalidate_activities_cache()
+    return app_module.activities
 
 
 @pytest.fixture(autouse=True)
 def reset_activities():
     """Reset activities to initial state before each test"""
-    activities.clear()
-    activities.update({
-        "Chess Club": {
-            "description": "Learn strategies and compete in chess tournaments",
-            "schedule": "Fridays, 3:30 PM - 5:00 PM",
-            "max_participants": 12,
-            "participants": ["michael@mergington.edu", "daniel@mergington.edu"]
-        },
-        "Programming Class": {
-            "description": "Learn programming fundamentals and build software projects",
-            "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
-            "max_participants": 20,
-            "participants": ["emma@mergington.edu", "sophia@mergington.edu"]
-        },
-        "Gym Class": {
-            "description": "Physical education and sports activities",
-            "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
-            "max_participants": 30,
-            "participants": ["john@mergington.edu", "olivia@mergington.edu"]
-        },
-        "Soccer Team": {
-            "description": "Competitive soccer training and matches",
-            "schedule": "Mondays, Wednesdays, 4:00 PM - 6:00 PM",
-            "max_participants": 18,
-            "participants": ["ryan@mergington.edu", "lisa@mergington.edu"]
-        },
-        "Basketball Club": {
-            "description": "Pick-up games, drills, and intramural tournaments",
-            "schedule": "Tuesdays and Thursdays, 5:00 PM - 7:00 PM",
-            "max_participants": 15,
-            "participants": ["mark@mergington.edu", "nina@mergington.edu"]
-        },
-        "Art Club": {
-            "description": "Explore drawing, painting, and mixed media projects",
-            "schedule": "Wednesdays, 3:30 PM - 5:00 PM",
-            "max_participants": 20,
-            "participants": ["hazel@mergington.edu", "aaron@mergington.edu"]
-        },
-        "Theater Club": {
-            "description": "Acting, stagecraft, and production of school plays",
-            "schedule": "Fridays, 4:00 PM - 6:00 PM",
-            "max_participants": 25,
-            "participants": ["isabella@mergington.edu", "tom@mergington.edu"]
-        },
-        "Debate Team": {
-            "description": "Practice argumentation, public speaking, and competitions",
-            "schedule": "Mondays and Thursdays, 4:00 PM - 5:30 PM",
-            "max_participants": 16,
-            "participants": ["sara@mergington.edu", "leo@mergington.edu"]
-        },
-        "Science Olympiad": {
-            "description": "Hands-on STEM challenges and interschool competitions",
-            "schedule": "Tuesdays, 3:30 PM - 5:30 PM",
-            "max_participants": 24,
-            "participants": ["maria@mergington.edu", "kevin@mergington.edu"]
-        }
-    })
+    return _load_initial_activities()
+
+
+@pytest.fixture
+def activities(reset_activities):
+    """The app's in-memory activities, freshly reset for this test"""
+    return reset_activities
 
 
 class TestRootEndpoint:
@@ -87,25 +156,35 @@ class TestRootEndpoint:
         """Test that root redirects to static index.html"""
         response = client.get("/", follow_redirects=False)
         assert response.status_code == 307
-        assert response.headers["location"] == "/static/index.html"
+        assert sys.intern(response.headers["location"]) is EXPECTED_LOCATION
+
+
+@pytest.fixture(scope="module")
+def activities_response(client):
+    """Fetch GET /activities once and share the response across read-only tests"""
+    # Module-scoped fixtures run before the per-test reset, so load the
+    # canonical state here rather than relying on test order
+    _load_initial_activities()
+    return client.get("/activities")
 
 
 class TestGetActivities:
     """Tests for the GET /activities endpoint"""
 
-    def test_get_activities_returns_all_activities(self, client):
+    def test_get_activities_returns_ok(self, activities_response):
+        """Test that GET /activities succeeds"""
+        assert activities_response.status_code == 200
+
+    def test_get_activities_returns_all_activities(self, activities_response):
         """Test that GET /activities returns all activities"""
-        response = client.get("/activities")
-        assert response.status_code == 200
-        data = response.json()
+        data = json_body(activities_response)
         assert len(data) == 9
         assert "Chess Club" in data
         assert "Programming Class" in data
 
-    def test_get_activities_contains_proper_structure(self, client):
+    def test_get_activities_contains_proper_structure(self, activities_response):
         """Test that each activity has the expected structure"""
-        response = client.get("/activities")
-        data = response.json()
+        data = json_body(activities_response)
         chess_club = data["Chess Club"]
         assert "description" in chess_club
         assert "schedule" in chess_club
@@ -117,139 +196,212 @@ class TestGetActivities:
 class TestSignupForActivity:
     """Tests for the POST /activities/{activity_name}/signup endpoint"""
 
-    def test_signup_new_student_success(self, client):
+    def test_signup_new_student_success(self, client, activities):
         """Test successful signup of a new student"""
-        response = client.post(
-            "/activities/Chess Club/signup?email=newstudent@mergington.edu"
-        )
+        response = signup_chess_club(client, "newstudent@mergington.edu")
         assert response.status_code == 200
-        data = response.json()
+        data = json_body(response)
         assert data["message"] == "Signed up newstudent@mergington.edu for Chess Club"
         
         # Verify student was added
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        assert "newstudent@mergington.edu" in activities_data["Chess Club"]["participants"]
+        assert "newstudent@mergington.edu" in activities["Chess Club"]["participants"]
+
+    def test_signup_is_reflected_in_cached_activities(self, client):
+        """Test that GET /activities is refreshed after a signup"""
+        data = json_body(client.get("/activities"))
+        assert "newstudent@mergington.edu" not in data["Chess Club"]["participants"]
+        signup_chess_club(client, "newstudent@mergington.edu")
+        data = json_body(client.get("/activities"))
+        assert "newstudent@mergington.edu" in data["Chess Club"]["participants"]
+
+    def test_signup_during_activities_rebuild_is_not_lost(self, monkeypatch):
+        """Test that a signup racing a GET /activities rebuild does not leave a stale cache"""
+        import src.app as app_module
+
+        building = threading.Event()
+        release = threading.Event()
+
+        def paused_dumps(value):
+            # Pause the first GET mid-build so a signup can try to interleave
+            if not building.is_set():
+                building.set()
+                release.wait(timeout=5)
+            return orjson.dumps(value)
+
+        monkeypatch.setattr(app_module, "orjson", SimpleNamespace(dumps=paused_dumps))
+
+        get_thread = threading.Thread(target=app_module.get_activities)
+        get_thread.start()
+        assert building.wait(timeout=5)
+
+        signup_thread = threading.Thread(
+            target=app_module.signup_for_activity,
+            args=("Chess Club", "racer@mergington.edu")
+        )
+        signup_thread.start()
+        signup_thread.join(timeout=0.2)
+        release.set()
+        get_thread.join(timeout=5)
+        signup_thread.join(timeout=5)
+
+        assert "racer@mergington.edu" in app_module.activities["Chess Club"]["participants"]
+        data = orjson.loads(app_module.get_activities().body)
+        assert "racer@mergington.edu" in data["Chess Club"]["participants"]
 
     def test_signup_for_nonexistent_activity_fails(self, client):
         """Test that signing up for a nonexistent activity returns 404"""
-        response = client.post(
-            "/activities/Nonexistent Club/signup?email=student@mergington.edu"
-        )
+        response = signup_nonexistent_club(client, "student@mergington.edu")
         assert response.status_code == 404
-        data = response.json()
+        data = json_body(response)
         assert data["detail"] == "Activity not found"
 
     def test_signup_duplicate_student_fails(self, client):
         """Test that signing up a student who is already registered fails"""
-        response = client.post(
-            "/activities/Chess Club/signup?email=michael@mergington.edu"
-        )
+        response = signup_chess_club(client, "michael@mergington.edu")
         assert response.status_code == 400
-        data = response.json()
+        data = json_body(response)
         assert data["detail"] == "Student already signed up for this activity"
 
-    def test_signup_multiple_students_to_same_activity(self, client):
-        """Test signing up multiple students to the same activity"""
-        # First signup
-        response1 = client.post(
-            "/activities/Chess Club/signup?email=student1@mergington.edu"
-        )
-        assert response1.status_code == 200
-        
-        # Second signup
-        response2 = client.post(
-            "/activities/Chess Club/signup?email=student2@mergington.edu"
+    def test_signup_multiple_students_to_same_activity(self, client, activities):
+        """Test signing up multiple students to the same activity in one batch"""
+        response = client.post(
+            CHESS_BATCH_SIGNUP,
+            json={"emails": ["student1@mergington.edu", "student2@mergington.edu"]}
         )
-        assert response2.status_code == 200
+        assert response.status_code == 200
+        data = json_body(response)
+        assert data["signed_up"] == ["student1@mergington.edu", "student2@mergington.edu"]
+        assert data["already_signed_up"] == []
         
         # Verify both were added
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        assert "student1@mergington.edu" in activities_data["Chess Club"]["participants"]
-        assert "student2@mergington.edu" in activities_data["Chess Club"]["participants"]
+        assert "student1@mergington.edu" in activities["Chess Club"]["participants"]
+        assert "student2@mergington.edu" in activities["Chess Club"]["participants"]
+
+    def test_get_activities_lists_participants_in_signup_order(self, client):
+        """Test that GET /activities keeps participants in the order they signed up"""
+        signup_chess_club(client, "zoe@mergington.edu")
+        signup_chess_club(client, "adam@mergington.edu")
+        data = json_body(client.get("/activities"))
+        assert data["Chess Club"]["participants"] == [
+            "michael@mergington.edu",
+            "daniel@mergington.edu",
+            "zoe@mergington.edu",
+            "adam@mergington.edu"
+        ]
+
+    def test_batch_signup_reports_already_signed_up_students(self, client):
+        """Test that a batch signup reports students who were already registered"""
+        response = client.post(
+            CHESS_BATCH_SIGNUP,
+            json={"emails": ["michael@mergington.edu", "student1@mergington.edu"]}
+        )
+        assert response.status_code == 200
+        data = json_body(response)
+        assert data["signed_up"] == ["student1@mergington.edu"]
+        assert data["already_signed_up"] == ["michael@mergington.edu"]
+
+    def test_batch_signup_ignores_repeated_emails(self, client, activities):
+        """Test that an email repeated within one batch is only signed up once"""
+        response = client.post(
+            CHESS_BATCH_SIGNUP,
+            json={"emails": ["student1@mergington.edu", "student1@mergington.edu"]}
+        )
+        assert response.status_code == 200
+        data = json_body(response)
+        assert data["signed_up"] == ["student1@mergington.edu"]
+        assert data["already_signed_up"] == []
+        assert "student1@mergington.edu" in activities["Chess Club"]["participants"]
+
+    def test_batch_signup_for_nonexistent_activity_fails(self, client):
+        """Test that a batch signup for a nonexistent activity returns 404"""
+        response = client.post(
+            NONEXISTENT_BATCH_SIGNUP, json={"emails": ["student@mergington.edu"]}
+        )
+        assert response.status_code == 404
+        data = json_body(response)
+        assert data["detail"] == "Activity not found"
 
 
 class TestUnregisterFromActivity:
     """Tests for the DELETE /activities/{activity_name}/unregister endpoint"""
 
-    def test_unregister_existing_student_success(self, client):
+    def test_unregister_existing_student_success(self, client, activities):
         """Test successful unregistration of an existing student"""
         response = client.delete(
-            "/activities/Chess Club/unregister?email=michael@mergington.edu"
+            CHESS_UNREGISTER, params={"email": "michael@mergington.edu"}
         )
         assert response.status_code == 200
-        data = response.json()
+        data = json_body(response)
         assert data["message"] == "Unregistered michael@mergington.edu from Chess Club"
         
         # Verify student was removed
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        assert "michael@mergington.edu" not in activities_data["Chess Club"]["participants"]
+        assert "michael@mergington.edu" not in activities["Chess Club"]["participants"]
 
     def test_unregister_from_nonexistent_activity_fails(self, client):
         """Test that unregistering from a nonexistent activity returns 404"""
         response = client.delete(
-            "/activities/Nonexistent Club/unregister?email=student@mergington.edu"
+            NONEXISTENT_UNREGISTER, params={"email": "student@mergington.edu"}
         )
         assert response.status_code == 404
-        data = response.json()
+        data = json_body(response)
         assert data["detail"] == "Activity not found"
 
     def test_unregister_student_not_signed_up_fails(self, client):
         """Test that unregistering a student who is not signed up fails"""
         response = client.delete(
-            "/activities/Chess Club/unregister?email=notsignedup@mergington.edu"
+            CHESS_UNREGISTER, params={"email": "notsignedup@mergington.edu"}
         )
         assert response.status_code == 400
-        data = response.json()
+        data = json_body(response)
         assert data["detail"] == "Student not signed up for this activity"
 
-    def test_signup_then_unregister_workflow(self, client):
+    def test_signup_then_unregister_workflow(self, client, activities):
         """Test the complete workflow of signing up and then unregistering"""
         email = "workflow@mergington.edu"
         
         # Sign up
-        signup_response = client.post(
-            f"/activities/Programming Class/signup?email={email}"
-        )
+        signup_response = signup_programming_class(client, email)
         assert signup_response.status_code == 200
         
-        # Verify signed up
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        assert email in activities_data["Programming Class"]["participants"]
-        
         # Unregister
         unregister_response = client.delete(
-            f"/activities/Programming Class/unregister?email={email}"
+            PROGRAMMING_UNREGISTER, params={"email": email}
         )
         assert unregister_response.status_code == 200
         
         # Verify unregistered
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        assert email not in activities_data["Programming Class"]["participants"]
+        assert email not in activities["Programming Class"]["participants"]
 
 
 class TestEdgeCases:
     """Tests for edge cases and error conditions"""
 
-    def test_activity_name_with_spaces_url_encoded(self, client):
-        """Test that activity names with spaces work when URL encoded"""
-        # FastAPI/TestClient handles URL encoding automatically
-        response = client.post(
-            "/activities/Chess Club/signup?email=encoded@mergington.edu"
-        )
+    @pytest.mark.parametrize("email", VALID_EMAILS)
+    def test_email_validation_accepts_valid_format(self, client, email):
+        """Test that valid email formats are accepted"""
+        response = signup_art_club(client, email)
         assert response.status_code == 200
 
-    def test_email_validation_accepts_valid_format(self, client):
-        """Test that valid email formats are accepted"""
-        valid_emails = [
-            "test@mergington.edu",
-            "first.last@mergington.edu",
-            "student123@mergington.edu"
-        ]
-        for email in valid_emails:
-            response = client.post(f"/activities/Art Club/signup?email={email}")
-            assert response.status_code == 200
+
+class TestConcurrentSignup:
+    """Tests that issue independent requests concurrently against the ASGI app"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_signups_to_same_activity(self, activities):
+        """Test that concurrent signups to the same activity all succeed"""
+        from httpx import ASGITransport, AsyncClient
+        from src.app import app
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            responses = await asyncio.gather(*(
+                ac.post(ART_SIGNUP, params={"email": email}) for email in VALID_EMAILS
+            ))
+
+        assert [response.status_code for response in responses] == [200] * len(VALID_EMAILS)
+        assert activities["Art Club"]["participants"].keys() >= set(VALID_EMAILS)
+
+    @pytest.mark.asyncio
+    async def test_async_tests_run_on_uvloop(self):
+        """Test that pytest-asyncio tests run on a uvloop event loop when it is installed"""
+        uvloop = pytest.importorskip("uvloop")
+        assert isinstance(asyncio.get_running_loop(), uvloop.Loop)